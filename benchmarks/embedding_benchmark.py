@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput micro-benchmark.
+
+Reports chunks per second for the shared EmbeddingService at different
+batch sizes and torch thread counts, using ~500 character chunks like the
+ones produced by the document splitter.
+
+    python benchmarks/embedding_benchmark.py --chunks 512 --batch-sizes 8,16,32,64,128 --threads 1,2,4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_service import EmbeddingService  # noqa: E402
+
+WORDS = (
+    "photosynthesis converts light energy into chemical energy stored in glucose "
+    "newton described inertia force mass and acceleration in three laws of motion "
+    "the cold war was a geopolitical rivalry marked by an arms race and a space race "
+    "algorithms are measured by time complexity and space complexity using big o notation"
+).split()
+
+
+def make_chunks(count, size=500, seed=42):
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = []
+        while sum(len(word) + 1 for word in words) < size:
+            words.append(rng.choice(WORDS))
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument('--chunks', type=int, default=512, help='chunks embedded per run')
+    parser.add_argument('--batch-sizes', default='8,16,32,64,128')
+    parser.add_argument('--threads', default=str(os.cpu_count() or 1), help='torch intra-op thread counts to try')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per setting, best is reported')
+    args = parser.parse_args()
+
+    import torch
+
+    chunks = make_chunks(args.chunks)
+    service = EmbeddingService(args.model)
+    service.embed_documents(chunks[:8])  # warm up
+
+    print(f"{'threads':>8} {'batch':>6} {'chunks/s':>10} {'seconds':>9}")
+    for threads in parse_list(args.threads):
+        torch.set_num_threads(threads)
+        for batch_size in parse_list(args.batch_sizes):
+            service.batch_size = batch_size
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                service.embed_documents(chunks)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{threads:>8} {batch_size:>6} {len(chunks) / best:>10.1f} {best:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test against a stub Gemini upstream.
+
+Starts a local stub that answers generateContent / streamGenerateContent
+after a fixed delay, then runs the app under the threaded Flask dev server
+and under the gevent production server (serve.py), firing concurrent
+requests at each and reporting throughput and latency.
+
+    python benchmarks/load_benchmark.py --concurrency 200 --requests 1000 --upstream-delay 1.0
+    python benchmarks/load_benchmark.py --endpoint chat   # needs the embedding model
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEV_SERVER = "from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+
+
+class StubGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 2048
+
+    def __init__(self, port, delay):
+        self.delay = delay
+        super().__init__(('127.0.0.1', port), StubGeminiHandler)
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream (e.g. an app being shut down) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    """Answers like Gemini after server.delay seconds"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.server.delay)
+
+        prompt = payload['contents'][-1]['parts'][0]['text']
+        quiz = re.search(r'exactly (\d+) multiple-choice', prompt)
+        if quiz:
+            text = json.dumps([{
+                'question': f"Stub question {random.randrange(10 ** 9)}?",
+                'options': ['A) one', 'B) two', 'C) three', 'D) four'],
+                'correct': 'A) one',
+                'explanation': 'Stub explanation.'
+            } for _ in range(int(quiz.group(1)))])
+        else:
+            text = "Photosynthesis converts light energy into chemical energy stored in glucose. " * 4
+
+        if 'streamGenerateContent' in self.path:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for start in range(0, len(text), 40):
+                event = {'candidates': [{'content': {'parts': [{'text': text[start:start + 40]}], 'role': 'model'}}]}
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            self.close_connection = True
+            return
+
+        body = json.dumps({'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_app(mode, port, stub_port, workdir):
+    env = dict(os.environ)
+    env['GEMINI_API_BASE'] = f"http://127.0.0.1:{stub_port}/v1beta/models/gemini-2.0-flash"
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+
+    if mode == 'dev':
+        command = [sys.executable, '-c', DEV_SERVER.format(port=port)]
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', '127.0.0.1', '--port', str(port)]
+    return subprocess.Popen(command, cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url, endpoint, timeout=300):
+    probe = '/readyz' if endpoint == 'chat' else '/api/quiz/bank'
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + probe, timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App did not become ready at {base_url}{probe}")
+
+
+def make_request(session, base_url, endpoint, index):
+    # Unique inputs so neither the response cache nor the question bank can answer
+    if endpoint == 'chat':
+        return session.post(f"{base_url}/api/chat", json={'message': f"Load test question {index}: explain photosynthesis"}, timeout=120)
+    return session.post(f"{base_url}/api/quiz/generate", json={'topic': f"load test topic {index}", 'num_questions': 5}, timeout=120)
+
+
+def run_load(base_url, endpoint, total, concurrency):
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(index):
+        nonlocal errors
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            ok = make_request(local.session, base_url, endpoint, index).status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors,
+        'seconds': wall,
+        'rps': total / wall,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='dev,gevent', help='servers to compare: dev, gevent')
+    parser.add_argument('--endpoint', choices=('quiz', 'chat'), default='quiz')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--upstream-delay', type=float, default=1.0, help='stub Gemini latency in seconds')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--stub-port', type=int, default=8799)
+    args = parser.parse_args()
+
+    stub = StubGeminiServer(args.stub_port, args.upstream_delay)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    print(f"{args.requests} {args.endpoint} requests, concurrency {args.concurrency}, "
+          f"upstream delay {args.upstream_delay}s")
+    print(f"{'server':>8} {'req/s':>8} {'p50 s':>7} {'p95 s':>7} {'errors':>7} {'seconds':>8}")
+
+    for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+        workdir = tempfile.mkdtemp(prefix=f'ai-tutor-load-{mode}-')
+        process = start_app(mode, args.port, args.stub_port, workdir)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_until_ready(base_url, args.endpoint)
+            result = run_load(base_url, args.endpoint, args.requests, args.concurrency)
+            print(f"{mode:>8} {result['rps']:>8.1f} {result['p50']:>7.2f} {result['p95']:>7.2f} "
+                  f"{result['errors']:>7} {result['seconds']:>8.2f}")
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
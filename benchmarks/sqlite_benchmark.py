@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+SQLite load benchmark for the tracking tables.
+
+Runs concurrent threads that each insert conversation rows and read the
+progress counters, comparing the old connect-per-request pattern against
+the pooled WAL connections and the write-behind conversation queue.
+
+    python benchmarks/sqlite_benchmark.py --threads 16 --requests 500
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database, WriteBehindQueue  # noqa: E402
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS conversations (
+        id TEXT PRIMARY KEY,
+        query TEXT NOT NULL,
+        response TEXT NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+INSERT = "INSERT INTO conversations (id, query, response) VALUES (?, ?, ?)"
+RESPONSE = "Photosynthesis converts light energy into chemical energy. " * 10
+
+
+def connect_per_request(path):
+    """The original pattern: open, execute, commit and close on every request"""
+    def handle():
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute(INSERT, (str(uuid.uuid4()), "what is photosynthesis", RESPONSE))
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(path)
+        conn.execute("SELECT COUNT(*) FROM conversations").fetchone()
+        conn.close()
+    return handle, lambda: None
+
+
+def pooled(path):
+    database = Database(path)
+
+    def handle():
+        conn = database.connect()
+        conn.execute(INSERT, (str(uuid.uuid4()), "what is photosynthesis", RESPONSE))
+        conn.commit()
+        conn.close()
+
+        conn = database.connect()
+        conn.execute("SELECT COUNT(*) FROM conversations").fetchone()
+        conn.close()
+    return handle, lambda: None
+
+
+def pooled_write_behind(path):
+    database = Database(path)
+    writer = WriteBehindQueue(database)
+
+    def handle():
+        writer.put(INSERT, (str(uuid.uuid4()), "what is photosynthesis", RESPONSE))
+
+        conn = database.connect()
+        conn.execute("SELECT COUNT(*) FROM conversations").fetchone()
+        conn.close()
+    return handle, writer.flush
+
+
+def run(name, factory, threads, requests_per_thread):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        conn = sqlite3.connect(path)
+        conn.execute(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        handle, drain = factory(path)
+        errors = []
+
+        def worker():
+            for _ in range(requests_per_thread):
+                try:
+                    handle()
+                except sqlite3.OperationalError as e:
+                    errors.append(e)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        drain()
+        elapsed = time.perf_counter() - started
+
+        conn = sqlite3.connect(path)
+        rows = conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+        conn.close()
+
+    total = threads * requests_per_thread
+    print(f"{name:<22} {total / elapsed:>10.1f} req/s {elapsed:>8.2f}s  rows={rows:<7} errors={len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help='requests per thread')
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.requests} requests (insert conversation + count)")
+    run('connect-per-request', connect_per_request, args.threads, args.requests)
+    run('pooled WAL', pooled, args.threads, args.requests)
+    run('pooled WAL + batching', pooled_write_behind, args.threads, args.requests)
+
+
+if __name__ == '__main__':
+    main()
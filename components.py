@@ -0,0 +1,122 @@
+"""
+Lazily / background-initialized component registry.
+
+Heavy components (vector store, speech, TTS) are built on daemon threads so
+the web server can bind its port and serve cheap endpoints immediately.
+Each component records how long its startup phase took.
+"""
+
+import threading
+import time
+import traceback
+
+
+class ComponentUnavailable(Exception):
+    """Raised when a component is still warming up or failed to start"""
+
+    def __init__(self, name, state):
+        super().__init__(f"Component '{name}' is {state}")
+        self.name = name
+        self.state = state
+
+
+class _Component:
+    def __init__(self, name, factory, required):
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.state = 'pending'
+        self.value = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    @property
+    def duration(self):
+        if self.started_at is None:
+            return None
+        end = self.finished_at or time.time()
+        return round(end - self.started_at, 3)
+
+
+class ComponentRegistry:
+    """Starts registered factories on background threads and hands out their results"""
+
+    def __init__(self):
+        self._components = {}
+        self._lock = threading.Lock()
+        self.created_at = time.time()
+
+    def register(self, name, factory, required=True):
+        """Register a zero-argument factory; required components gate readiness"""
+        with self._lock:
+            self._components[name] = _Component(name, factory, required)
+
+    def start(self, *names):
+        """Begin warming up the given components (all of them by default)"""
+        for name in names or list(self._components):
+            self._launch(self._components[name])
+
+    def get(self, name, timeout=None):
+        """Return a component's value, starting it lazily and waiting up to timeout"""
+        component = self._components[name]
+        self._launch(component)
+
+        if not component.done.wait(timeout):
+            raise ComponentUnavailable(name, component.state)
+        if component.state != 'ready':
+            raise ComponentUnavailable(name, component.state)
+        return component.value
+
+    def is_ready(self, name):
+        return self._components[name].state == 'ready'
+
+    def ready(self):
+        """True once every required component has started successfully"""
+        return all(component.state == 'ready'
+                   for component in self._components.values() if component.required)
+
+    def status(self):
+        return {
+            name: {
+                'state': component.state,
+                'required': component.required,
+                'duration': component.duration,
+                'error': component.error
+            }
+            for name, component in self._components.items()
+        }
+
+    def uptime(self):
+        return round(time.time() - self.created_at, 3)
+
+    def _launch(self, component):
+        with self._lock:
+            if component.state != 'pending':
+                return
+            component.state = 'starting'
+            component.started_at = time.time()
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(component,),
+            name=f"init-{component.name}",
+            daemon=True
+        )
+        thread.start()
+
+    def _run(self, component):
+        try:
+            component.value = component.factory()
+            component.state = 'ready'
+            component.finished_at = time.time()
+            print(f"⏱️  {component.name} ready in {component.duration:.2f}s")
+        except Exception as e:
+            component.error = str(e)
+            component.state = 'failed'
+            component.finished_at = time.time()
+            print(f"❌ {component.name} failed to start after {component.duration:.2f}s: {e}")
+            traceback.print_exc()
+        finally:
+            component.done.set()
@@ -0,0 +1,28 @@
+"""
+Cooperative-server support.
+
+Under the production server (serve.py) the standard library is
+monkey-patched by gevent, so sockets, locks and sleeps yield to other
+greenlets and slow Gemini calls no longer pin a worker. CPU-bound native
+code (torch encodes, the TTS engine) would still stall every greenlet,
+so it is handed to gevent's pool of real OS threads instead.
+"""
+
+try:
+    from gevent import get_hub
+    from gevent import monkey
+except ImportError:  # gevent is only needed for serve.py
+    get_hub = None
+    monkey = None
+
+
+def cooperative():
+    """True when running under gevent's monkey-patched threading"""
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def run_blocking(func, *args, **kwargs):
+    """Call func on a native thread when cooperative, otherwise inline"""
+    if not cooperative():
+        return func(*args, **kwargs)
+    return get_hub().threadpool.apply(func, args, kwargs)
@@ -0,0 +1,140 @@
+"""
+Token-budgeted context assembly for the "stuff" chain.
+
+Every retrieved chunk used to go into the prompt whole: neighbouring
+chunks repeat up to CHUNK_OVERLAP characters of each other, and weak
+matches ride along with strong ones. The builder drops chunks whose
+similarity to the question is below a floor, strips text a higher-ranked
+chunk already carries and trims what is left to a token budget, reporting
+the prompt size.
+"""
+
+import math
+import threading
+
+from langchain_core.documents import Document
+
+CHARS_PER_TOKEN = 4  # rough average for English text under Gemini's tokenizer
+
+
+def estimate_tokens(text):
+    """Approximate token count without a tokenizer round trip"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def overlap_length(first, second, min_overlap, max_overlap):
+    """Length of the longest suffix of first that is also a prefix of second"""
+    for length in range(min(max_overlap, len(first), len(second)), min_overlap - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+
+def trim_to(text, max_chars):
+    """Cut text to max_chars, preferring a sentence and then a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    for boundary in ('. ', '\n', ' '):
+        index = cut.rfind(boundary)
+        if index >= max_chars // 2:
+            return cut[:index + 1].rstrip()
+    return cut
+
+
+class ContextBuilder:
+    """Selects, deduplicates and trims retrieved chunks to fit a token budget"""
+
+    def __init__(self, token_budget=500, min_relevance=0.25, max_overlap=50, min_overlap=16, min_trim_tokens=32):
+        self.token_budget = token_budget
+        self.min_relevance = min_relevance
+        self.max_overlap = max_overlap
+        self.min_overlap = min_overlap
+        self.min_trim_tokens = min_trim_tokens
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.max_prompt_tokens = 0
+        self.context_tokens = 0
+        self.tokens_removed = 0
+        self.chunks_retrieved = 0
+        self.chunks_used = 0
+
+    def select(self, docs):
+        """Return (documents, report): the chunks to stuff, best first, and what was cut"""
+        retrieved_tokens = sum(estimate_tokens(doc.page_content) for doc in docs)
+        relevant = [doc for doc in docs if doc.metadata.get('relevance', 1.0) >= self.min_relevance]
+
+        unique = []
+        for doc in relevant:
+            text = self._without_repeats(doc.page_content.strip(), unique)
+            if len(text) >= self.min_overlap:
+                unique.append(Document(page_content=text, metadata=doc.metadata))
+
+        selected = []
+        used = 0
+        trimmed = 0
+        for doc in unique:
+            tokens = estimate_tokens(doc.page_content)
+            remaining = self.token_budget - used
+            if tokens > remaining:
+                if remaining >= self.min_trim_tokens:
+                    text = trim_to(doc.page_content, remaining * CHARS_PER_TOKEN)
+                    selected.append(Document(page_content=text, metadata=doc.metadata))
+                    used += estimate_tokens(text)
+                    trimmed += 1
+                break
+            selected.append(doc)
+            used += tokens
+
+        return selected, {
+            'chunks_retrieved': len(docs),
+            'chunks_used': len(selected),
+            'dropped_low_score': len(docs) - len(relevant),
+            'dropped_duplicate': len(relevant) - len(unique),
+            'dropped_over_budget': len(unique) - len(selected),
+            'trimmed': trimmed,
+            'context_tokens': used,
+            'tokens_removed': retrieved_tokens - used
+        }
+
+    def record(self, report, prompt_tokens):
+        """Add the full prompt size to report and to the running totals"""
+        report['prompt_tokens'] = prompt_tokens
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+            self.context_tokens += report['context_tokens']
+            self.tokens_removed += report['tokens_removed']
+            self.chunks_retrieved += report['chunks_retrieved']
+            self.chunks_used += report['chunks_used']
+        return report
+
+    def stats(self):
+        with self._lock:
+            return {
+                'token_budget': self.token_budget,
+                'min_relevance': self.min_relevance,
+                'requests': self.requests,
+                'avg_prompt_tokens': round(self.prompt_tokens / self.requests, 1) if self.requests else None,
+                'max_prompt_tokens': self.max_prompt_tokens,
+                'avg_context_tokens': round(self.context_tokens / self.requests, 1) if self.requests else None,
+                'tokens_removed': self.tokens_removed,
+                'chunks_retrieved': self.chunks_retrieved,
+                'chunks_used': self.chunks_used
+            }
+
+    def _without_repeats(self, text, kept):
+        """Strip text that higher-ranked chunks already carry"""
+        for prior in kept:
+            prior_text = prior.page_content
+            if text in prior_text:
+                return ''
+            # Splitter overlap: this chunk either continues the earlier one or leads into it
+            head = overlap_length(prior_text, text, self.min_overlap, self.max_overlap)
+            text = text[head:].lstrip()
+            tail = overlap_length(text, prior_text, self.min_overlap, self.max_overlap)
+            if tail:
+                text = text[:-tail].rstrip()
+        return text
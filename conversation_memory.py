@@ -0,0 +1,204 @@
+"""
+Bounded multi-turn conversation memory.
+
+Each conversation keeps its last few turns verbatim and folds older ones
+into a running summary, updated incrementally on a background worker, so
+the history sent with a question stays under a fixed token budget however
+long the conversation gets. Active conversations live in an in-memory LRU;
+evicted ones are reloaded from the conversations table and their summary,
+after waiting only for that conversation's rows still in the write-behind
+queue. Conversations the server starts itself never touch the database.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from context_builder import estimate_tokens, trim_to, CHARS_PER_TOKEN
+
+
+class _Conversation:
+    """Summary plus the turns not yet folded into it"""
+
+    def __init__(self, summary, summarized, turns, next_turn):
+        self.lock = threading.Lock()
+        self.summary = summary
+        self.summarized = summarized  # last turn number folded into the summary
+        self.turns = turns  # [(turn, query, response)] after summarized, oldest first
+        self.next_turn = next_turn
+        self.folding = False
+
+
+class ConversationMemory:
+    """LRU of active conversations backed by SQLite, with rolling summarization"""
+
+    def __init__(self, database, writer, summarize, recent_turns=4, token_budget=800,
+                 cache_size=1000, workers=1):
+        self.database = database
+        self.writer = writer
+        self.summarize = summarize
+        self.recent_turns = recent_turns
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self._conversations = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='conversation-summary')
+        # Rows per conversation queued for the writer but not yet committed
+        self._pending = {}
+        self._pending_changed = threading.Condition()
+        self.hits = 0
+        self.loads = 0
+        self.summaries = 0
+        self.summary_failures = 0
+
+    def start(self):
+        """Begin a new conversation and return its ID"""
+        conversation_id = str(uuid.uuid4())
+        with self._lock:
+            self._conversations[conversation_id] = _Conversation('', 0, [], 1)
+            while len(self._conversations) > self.cache_size:
+                self._conversations.popitem(last=False)
+        return conversation_id
+
+    def history(self, conversation_id):
+        """Summary and recent turns rendered for the prompt, within token_budget"""
+        conversation = self._get(conversation_id)
+        with conversation.lock:
+            summary = conversation.summary
+            turns = list(conversation.turns)
+
+        parts = []
+        remaining = self.token_budget
+        if summary:
+            summary = trim_to(summary, remaining * CHARS_PER_TOKEN)
+            parts.append(f"Summary of earlier conversation: {summary}")
+            remaining -= estimate_tokens(parts[0])
+
+        recent = []
+        for _, query, response in reversed(turns[-self.recent_turns:]):
+            text = f"Student: {query}\nTutor: {response}"
+            tokens = estimate_tokens(text)
+            if tokens > remaining:
+                # The newest turn matters most, so it is cut rather than dropped
+                if not recent and remaining > 0:
+                    recent.append(trim_to(text, remaining * CHARS_PER_TOKEN))
+                break
+            recent.append(text)
+            remaining -= tokens
+
+        parts.extend(reversed(recent))
+        return '\n\n'.join(parts)
+
+    def append(self, conversation_id, query, response):
+        """Record a turn; older turns are folded into the summary in the background"""
+        conversation = self._get(conversation_id)
+        with conversation.lock:
+            turn = conversation.next_turn
+            conversation.next_turn += 1
+            conversation.turns.append((turn, query, response))
+            with self._pending_changed:
+                self._pending[conversation_id] = self._pending.get(conversation_id, 0) + 1
+            self.writer.put(
+                "INSERT INTO conversations (id, conversation_id, turn, query, response) VALUES (?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), conversation_id, turn, query, response),
+                on_done=lambda: self._written(conversation_id)
+            )
+        self._maybe_fold(conversation_id, conversation)
+        return turn
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.loads
+            return {
+                'cached_conversations': len(self._conversations),
+                'hits': self.hits,
+                'loads': self.loads,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'summaries': self.summaries,
+                'summary_failures': self.summary_failures
+            }
+
+    def _get(self, conversation_id):
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is not None:
+                self._conversations.move_to_end(conversation_id)
+                self.hits += 1
+                return conversation
+            self.loads += 1
+
+        conversation = self._load(conversation_id)
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first copy
+            conversation = self._conversations.setdefault(conversation_id, conversation)
+            self._conversations.move_to_end(conversation_id)
+            while len(self._conversations) > self.cache_size:
+                self._conversations.popitem(last=False)
+
+        self._maybe_fold(conversation_id, conversation)
+        return conversation
+
+    def _written(self, conversation_id):
+        with self._pending_changed:
+            remaining = self._pending.pop(conversation_id, 0) - 1
+            if remaining > 0:
+                self._pending[conversation_id] = remaining
+            self._pending_changed.notify_all()
+
+    def _load(self, conversation_id):
+        # This conversation's turns still queued for the batched writer must land before we read
+        with self._pending_changed:
+            self._pending_changed.wait_for(lambda: not self._pending.get(conversation_id), timeout=1)
+        with self.database.connect() as conn:
+            row = conn.execute(
+                "SELECT summary, turns_summarized FROM conversation_summaries WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+            summary, summarized = row if row else ('', 0)
+            turns = conn.execute(
+                """SELECT turn, query, response FROM conversations
+                   WHERE conversation_id = ? AND turn > ? ORDER BY turn""",
+                (conversation_id, summarized)
+            ).fetchall()
+
+        next_turn = turns[-1][0] + 1 if turns else summarized + 1
+        return _Conversation(summary, summarized, [tuple(turn) for turn in turns], next_turn)
+
+    def _maybe_fold(self, conversation_id, conversation):
+        with conversation.lock:
+            if conversation.folding or len(conversation.turns) <= self.recent_turns:
+                return
+            conversation.folding = True
+            folded = conversation.turns[:-self.recent_turns]
+            summary = conversation.summary
+        self._executor.submit(self._fold, conversation_id, conversation, summary, folded)
+
+    def _fold(self, conversation_id, conversation, summary, folded):
+        try:
+            summary = self.summarize(summary, [(query, response) for _, query, response in folded])
+            last_turn = folded[-1][0]
+            with self.database.connect() as conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO conversation_summaries
+                       (conversation_id, summary, turns_summarized, updated) VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
+                    (conversation_id, summary, last_turn)
+                )
+        except Exception as e:
+            # The turns stay verbatim (history() still caps them) and fold on the next append
+            print(f"Conversation summary error: {e}")
+            with self._lock:
+                self.summary_failures += 1
+            with conversation.lock:
+                conversation.folding = False
+            return
+
+        with conversation.lock:
+            conversation.summary = summary
+            conversation.summarized = last_turn
+            conversation.turns = [turn for turn in conversation.turns if turn[0] > last_turn]
+            conversation.folding = False
+        with self._lock:
+            self.summaries += 1
+        # Turns may have arrived while the summary was being written
+        self._maybe_fold(conversation_id, conversation)
@@ -0,0 +1,211 @@
+"""
+SQLite data-access layer.
+
+Connections are pooled instead of opened per request, run in WAL mode with
+tuned pragmas so readers never block the writer, and high-volume inserts
+can go through a write-behind queue that commits them in batches.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+from metrics import time_stage
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor whose statements are timed under the 'sqlite' stage"""
+
+    def execute(self, sql, parameters=()):
+        with time_stage('sqlite'):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with time_stage('sqlite'):
+            return super().executemany(sql, seq_of_parameters)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements and commits are timed under the 'sqlite' stage"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        with time_stage('sqlite'):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with time_stage('sqlite'):
+            return super().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        with time_stage('sqlite'):
+            return super().commit()
+
+
+class PooledConnection:
+    """Proxy for a pooled sqlite3 connection; close() returns it to the pool"""
+
+    def __init__(self, database, conn):
+        self._database = database
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection")
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._database._release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self._conn is not None and self._conn.in_transaction:
+            self._conn.commit()
+        self.close()
+        return False
+
+
+class Database:
+    """Pool of WAL-mode SQLite connections, each used by one thread at a time"""
+
+    def __init__(self, path, pool_size=8, busy_timeout=5.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.checkouts = 0
+
+    def connect(self):
+        """Check out a connection; call close() (or use `with`) to return it"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        with self._lock:
+            self.checkouts += 1
+        return PooledConnection(self, conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'idle': self._idle.qsize(),
+                'checkouts': self.checkouts,
+                'pool_size': self.pool_size
+            }
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False,
+                               factory=TimedConnection)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable across app crashes in WAL mode
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-16000")  # 16 MB page cache per connection
+        conn.execute("PRAGMA foreign_keys=ON")
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _release(self, conn):
+        # Work that was never committed must not leak into the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+
+class WriteBehindQueue:
+    """Buffers INSERT/UPDATE statements and commits them in batches on a background thread"""
+
+    def __init__(self, database, batch_size=200, flush_interval=0.2):
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._worker, name='db-write-behind', daemon=True)
+        self._thread.start()
+        # Give queued rows a chance to land on a clean shutdown
+        atexit.register(self.flush, timeout=5)
+
+    def put(self, sql, params=(), on_done=None):
+        """Queue a statement; it is committed within flush_interval seconds, then on_done() is called"""
+        self._queue.put((sql, params, on_done))
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written"""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'pending': self._queue.qsize(),
+                'written': self.written,
+                'batches': self.batches,
+                'failed': self.failed
+            }
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                for _, _, on_done in batch:
+                    if on_done is not None:
+                        try:
+                            on_done()
+                        except Exception as e:
+                            print(f"Write-behind callback failed: {e}")
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        try:
+            with self.database.connect() as conn:
+                for sql, params, _ in batch:
+                    conn.execute(sql, params)
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"Write-behind statement failed: {e}")
+                with self._stats_lock:
+                    self.failed += 1
+                return
+            # Isolate the bad statement instead of dropping the whole batch
+            for item in batch:
+                self._write([item])
+            return
+
+        with self._stats_lock:
+            self.written += len(batch)
+            self.batches += 1
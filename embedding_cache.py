@@ -0,0 +1,166 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are stored as float32 blobs in SQLite, keyed by a hash of the
+model name and the exact text embedded, with an LRU tier in memory. Seed
+chunks at boot, repeated uploads and repeated queries are then looked up
+instead of being run through the model again. The table is capped at
+max_entries rows; past that the least recently used vectors are pruned.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from db import Database
+
+
+class EmbeddingCache:
+    """SQLite-backed float32 vector cache with an in-memory LRU tier"""
+
+    def __init__(self, path, model_name, memory_entries=10000, max_entries=100000):
+        self.path = path
+        self.model_name = model_name
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.database = Database(path, pool_size=4)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.pruned = 0
+
+        with self.database.connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key BLOB PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(embeddings)")]
+            if 'last_used' not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            # Counted once here, then kept current by put_many and _prune
+            self.entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._prune()
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).digest()
+
+    def get_many(self, texts):
+        """Cached vectors for texts, with None where the cache has nothing"""
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+        missing = {}
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[index] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(index)
+
+        if missing:
+            found = self._load(list(missing))
+            with self._lock:
+                for key, indexes in missing.items():
+                    vector = found.get(key)
+                    if vector is None:
+                        self.misses += len(indexes)
+                        continue
+                    self.disk_hits += len(indexes)
+                    self._remember(key, vector)
+                    for index in indexes:
+                        vectors[index] = vector
+        return vectors
+
+    def put_many(self, texts, vectors):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes(), int(time.time())))
+
+        # A key always maps to the same vector, so an existing row is left as it is
+        with self.database.connect() as conn:
+            added = conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            ).rowcount
+        with self._lock:
+            self.entries += added
+        self._prune()
+
+    def stats(self):
+        disk_bytes = sum(os.path.getsize(self.path + suffix)
+                         for suffix in ('', '-wal') if os.path.exists(self.path + suffix))
+
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': self.entries,
+                'max_entries': self.max_entries,
+                'pruned': self.pruned,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': disk_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None
+            }
+
+    def _load(self, keys):
+        found = {}
+        with self.database.connect() as conn:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                for key, blob in conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch):
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            # Disk hits count as uses so pruning keeps them; memory hits never reach here
+            now = int(time.time())
+            hits = list(found)
+            for start in range(0, len(hits), 500):
+                batch = hits[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                conn.execute(f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})", [now] + batch)
+        return found
+
+    def _prune(self):
+        # Trim to 90% of the cap so a full cache isn't pruned on every insert
+        with self._lock:
+            if self.entries <= self.max_entries:
+                return
+            excess = self.entries - int(self.max_entries * 0.9)
+        with self.database.connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            ).rowcount
+        with self._lock:
+            self.entries -= removed
+            self.pruned += removed
+
+    def _remember(self, key, vector):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while len(self._memory) > self.memory_entries:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
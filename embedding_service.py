@@ -0,0 +1,100 @@
+"""
+Shared embedding service for ingestion, retrieval and caching.
+
+Wraps the sentence-transformers model behind the LangChain ``Embeddings``
+interface and embeds in fixed-size batches with a configurable number of
+torch intra-op threads. On CPU-only hosts this keeps memory bounded on
+large uploads and lets query embeddings interleave between ingestion batches.
+With an EmbeddingCache attached, texts embedded before are looked up and
+only the misses are encoded.
+"""
+
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from concurrency import run_blocking
+from metrics import time_stage
+
+
+class EmbeddingService(Embeddings):
+    """Batched, thread-tuned sentence-transformers embedder"""
+
+    def __init__(self, model_name, batch_size=32, num_threads=None, device='cpu', cache=None):
+        # Imported here so torch loads on the background init path, not when app.py is imported
+        from sentence_transformers import SentenceTransformer
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.device = device
+        self.cache = cache
+        self.model = SentenceTransformer(model_name, device=device)
+
+        # One batch at a time: concurrent encodes only fight over the same cores
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.texts_embedded = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def embed_documents(self, texts):
+        """Embed texts in batches of batch_size, encoding only cache misses"""
+        texts = [text.replace("\n", " ") for text in texts]
+        if self.cache is None:
+            return self._encode_batches(texts)
+
+        vectors = self.cache.get_many(texts)
+        misses = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if misses:
+            encoded = dict(zip(misses, self._encode_batches(misses)))
+            self.cache.put_many(misses, encoded.values())
+            vectors = [encoded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return [vector.tolist() if hasattr(vector, 'tolist') else vector for vector in vectors]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def stats(self):
+        cache = self.cache.stats() if self.cache is not None else None
+        with self._stats_lock:
+            return {
+                'model': self.model_name,
+                'batch_size': self.batch_size,
+                'num_threads': self.num_threads,
+                'texts_embedded': self.texts_embedded,
+                'batches': self.batches,
+                'seconds': round(self.seconds, 3),
+                'texts_per_second': round(self.texts_embedded / self.seconds, 1) if self.seconds else 0.0,
+                'cache': cache
+            }
+
+    def _encode_batches(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start:start + self.batch_size]))
+        return vectors
+
+    def _encode(self, batch):
+        with self._lock:
+            started = time.perf_counter()
+            # Off the event loop under the cooperative server
+            with time_stage('embedding'):
+                vectors = run_blocking(
+                    self.model.encode,
+                    batch,
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                )
+            elapsed = time.perf_counter() - started
+
+        with self._stats_lock:
+            self.texts_embedded += len(batch)
+            self.batches += 1
+            self.seconds += elapsed
+        return vectors.tolist()
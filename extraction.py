@@ -0,0 +1,122 @@
+"""
+Streaming text extraction for uploaded documents.
+
+Documents are read section by section (PDF pages, groups of DOCX paragraphs
+or TXT lines) and split incrementally, so peak memory depends on the batch
+size rather than the size of the file. Large PDFs can optionally be
+extracted across a process pool, a bounded window of page ranges at a time.
+"""
+
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+from docx import Document as DocxDocument
+from langchain.docstore.document import Document
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'txt')
+
+
+def iter_pdf_pages(file_path, processes=0, min_parallel_pages=100, pages_per_task=16):
+    """Yield (page_number, text) for each PDF page, in order"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+
+        if processes <= 1 or page_count < min_parallel_pages:
+            for page_number, page in enumerate(pdf_reader.pages, start=1):
+                yield page_number, page.extract_text() or ""
+            return
+
+    # Workers reopen the file themselves, only the page count was needed here
+    yield from _iter_pdf_pages_parallel(file_path, page_count, processes, pages_per_task)
+
+
+def _extract_pdf_range(file_path, start, stop):
+    """Process pool task: extract pages [start, stop) of a PDF"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(index + 1, pdf_reader.pages[index].extract_text() or "")
+                for index in range(start, stop)]
+
+
+def _iter_pdf_pages_parallel(file_path, page_count, processes, pages_per_task):
+    ranges = ((start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task))
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # Keep a bounded window of ranges in flight and yield them in order
+        in_flight = deque()
+        for start, stop in itertools.islice(ranges, processes * 2):
+            in_flight.append(executor.submit(_extract_pdf_range, file_path, start, stop))
+
+        while in_flight:
+            pages = in_flight.popleft().result()
+            for start, stop in itertools.islice(ranges, 1):
+                in_flight.append(executor.submit(_extract_pdf_range, file_path, start, stop))
+            yield from pages
+
+
+def _iter_blocks(lines, block_size):
+    """Group lines into blocks of roughly block_size characters"""
+    block, length = [], 0
+    for line in lines:
+        block.append(line)
+        length += len(line) + 1
+        if length >= block_size:
+            yield "\n".join(block)
+            block, length = [], 0
+    if block:
+        yield "\n".join(block)
+
+
+def iter_docx_blocks(file_path, block_size=4000):
+    """Yield (None, text) for groups of DOCX paragraphs"""
+    doc = DocxDocument(file_path)
+    for block in _iter_blocks((paragraph.text for paragraph in doc.paragraphs), block_size):
+        yield None, block
+
+
+def iter_txt_blocks(file_path, block_size=4000):
+    """Yield (None, text) for groups of lines of a UTF-8 text file"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for block in _iter_blocks((line.rstrip("\n") for line in file), block_size):
+            yield None, block
+
+
+def iter_document_sections(file_path, file_ext, pdf_processes=0):
+    """Yield (page_number or None, text) sections of a supported document"""
+    if file_ext == 'pdf':
+        return iter_pdf_pages(file_path, processes=pdf_processes)
+    if file_ext == 'docx':
+        return iter_docx_blocks(file_path)
+    if file_ext == 'txt':
+        return iter_txt_blocks(file_path)
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+
+def iter_document_chunks(sections, text_splitter, metadata, on_section=None):
+    """Split sections as they arrive, tagging PDF chunks with their page number"""
+    for page_number, text in sections:
+        if on_section:
+            on_section(page_number)
+        if not text.strip():
+            continue
+
+        section_metadata = dict(metadata)
+        if page_number is not None:
+            section_metadata['page'] = page_number
+
+        for chunk in text_splitter.split_text(text):
+            yield Document(page_content=chunk, metadata=dict(section_metadata))
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
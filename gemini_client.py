@@ -0,0 +1,227 @@
+"""
+Shared HTTP client for the Gemini API.
+
+One pooled keep-alive ``requests.Session`` serves every call, with
+connect/read timeouts, exponential-backoff retries (full jitter) on 429 and
+5xx responses, a circuit breaker that fails fast while the upstream is down,
+and per-call latency metrics.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import time_stage
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails after all retries"""
+
+
+class CircuitOpenError(GeminiError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single trial call through"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+
+class GeminiClient:
+    """Pooled, retrying, circuit-broken client for generateContent calls"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key, base_url, connect_timeout=5, read_timeout=60,
+                 max_retries=3, backoff_base=0.5, backoff_max=8, pool_size=32,
+                 breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'X-goog-api-key': api_key
+        })
+
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def generate_content(self, payload):
+        """POST :generateContent and return the decoded JSON response"""
+        with time_stage('gemini'):
+            response = self._post(':generateContent', payload)
+            try:
+                return response.json()
+            except ValueError as e:
+                raise GeminiError(f"Gemini returned invalid JSON: {e}") from e
+            finally:
+                response.close()
+
+    def stream_generate_content(self, payload):
+        """POST :streamGenerateContent and yield each SSE event's JSON payload"""
+        # Timed until the stream ends, which is what the user waits for
+        with time_stage('gemini_stream'):
+            response = self._post(':streamGenerateContent?alt=sse', payload, stream=True)
+            with response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith('data:'):
+                        yield json.loads(line[len('data:'):].strip())
+
+    @staticmethod
+    def extract_text(result):
+        """Concatenate the text parts of the first candidate, or None"""
+        candidates = result.get('candidates') or []
+        if not candidates:
+            return None
+        parts = candidates[0].get('content', {}).get('parts', [])
+        texts = [part['text'] for part in parts if part.get('text')]
+        return ''.join(texts) if texts else None
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            return {
+                'calls': self.calls,
+                'failures': self.failures,
+                'retries': self.retries,
+                'rejected_by_breaker': self.rejected,
+                'breaker_state': self.breaker.state,
+                'latency_p50': _percentile(latencies, 0.50),
+                'latency_p95': _percentile(latencies, 0.95),
+                'latency_max': round(latencies[-1], 4) if latencies else None
+            }
+
+    def _post(self, method, payload, stream=False):
+        if not self.breaker.allow():
+            with self._stats_lock:
+                self.rejected += 1
+            raise CircuitOpenError("Gemini circuit breaker is open")
+
+        url = f"{self.base_url}{method}"
+        started = time.perf_counter()
+        attempt = 0
+
+        while True:
+            error = None
+            retry_after = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
+                if response.status_code not in self.RETRY_STATUSES:
+                    response.raise_for_status()
+                    self._record(started, ok=True)
+                    return response
+                error = GeminiError(f"Gemini returned HTTP {response.status_code}")
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.HTTPError as e:
+                # Other 4xx responses won't succeed on retry, but the upstream is healthy
+                self._record(started, ok=False, healthy=True)
+                raise GeminiError(str(e)) from e
+            except requests.RequestException as e:
+                # Truncated or undecodable bodies and redirect loops aren't retried, but still settle the breaker
+                self._record(started, ok=False)
+                raise GeminiError(str(e)) from e
+            except BaseException:
+                # Anything else, including an interrupted call, must not leave a half-open trial in flight
+                self._record(started, ok=False)
+                raise
+
+            if attempt >= self.max_retries:
+                self._record(started, ok=False)
+                raise GeminiError(f"Gemini call failed after {attempt + 1} attempts: {error}") from error
+
+            attempt += 1
+            with self._stats_lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying workers from stampeding in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _record(self, started, ok, healthy=None):
+        elapsed = time.perf_counter() - started
+        healthy = ok if healthy is None else healthy
+        if healthy:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        with self._stats_lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self._latencies.append(elapsed)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 4)
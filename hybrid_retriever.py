@@ -0,0 +1,178 @@
+"""
+Hybrid sparse + dense retrieval.
+
+Dense MiniLM search is good at paraphrases but often misses exact terms
+("O₃", "ARPANET"). An in-process BM25 index over the same chunks catches
+those. Both result lists are merged with weighted reciprocal-rank fusion,
+and a small CPU cross-encoder can optionally rerank the fused candidates.
+Each returned chunk carries its cosine similarity to the question as
+``relevance``, for the context builder to filter on.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from concurrency import run_blocking
+from metrics import time_stage
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def cosine_similarity(first, second):
+    dot = sum(a * b for a, b in zip(first, second))
+    norm = math.sqrt(sum(a * a for a in first)) * math.sqrt(sum(b * b for b in second))
+    return dot / norm if norm else 0.0
+
+
+def tokenize(text):
+    """NFKC-fold (O₃ -> o3), casefold and split into word tokens"""
+    return TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text).casefold())
+
+
+class BM25Index:
+    """Thread-safe inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._documents = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._documents)
+
+    def add(self, ids, documents):
+        """Index documents under their vector store ids, replacing existing entries"""
+        with self._lock:
+            for doc_id, doc in zip(ids, documents):
+                self._remove(doc_id)
+                counts = Counter(tokenize(doc.page_content))
+                for term, frequency in counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = frequency
+                length = sum(counts.values())
+                self._documents[doc_id] = doc
+                self._lengths[doc_id] = length
+                self._total_length += length
+
+    def remove(self, ids):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def search(self, query, k):
+        """Return up to k (document, score) pairs, best first"""
+        with self._lock:
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count
+
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._documents[doc_id], score) for doc_id, score in best]
+
+    def _remove(self, doc_id):
+        doc = self._documents.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in set(tokenize(doc.page_content)):
+            postings = self._postings.get(term)
+            if postings:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+
+class HybridRetriever(BaseRetriever):
+    """Reciprocal-rank fusion of BM25 and vector search, optionally cross-encoder reranked"""
+
+    vectorstore: Any
+    index: Any
+    k: int = 3
+    dense_k: int = 10
+    sparse_k: int = 10
+    rrf_k: int = 60
+    dense_weight: float = 1.0
+    sparse_weight: float = 1.0
+    reranker: Any = None
+    rerank_candidates: int = 10
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs):
+        """Build the BM25 side from every chunk already in the vector store"""
+        index = BM25Index()
+        stored = vectorstore.get(include=['documents', 'metadatas'])
+        index.add(stored['ids'], [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(stored['documents'], stored['metadatas'])
+        ])
+        return cls(vectorstore=vectorstore, index=index, **kwargs)
+
+    def add_documents(self, documents, ids):
+        """Mirror chunks just written to the vector store"""
+        self.index.add(ids, documents)
+
+    def remove_documents(self, ids):
+        self.index.remove(ids)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        embeddings = self.vectorstore.embeddings
+        with time_stage('retrieval'):
+            query_vector = embeddings.embed_query(query)
+            dense = self.vectorstore.similarity_search_by_vector(query_vector, k=self.dense_k) if self.dense_k else []
+        with time_stage('bm25'):
+            sparse = [doc for doc, _ in self.index.search(query, self.sparse_k)]
+
+        # Weighted RRF, keyed on chunk text since both sides hold the same chunks
+        fused = {}
+        for weight, results in ((self.dense_weight, dense), (self.sparse_weight, sparse)):
+            for rank, doc in enumerate(results, start=1):
+                entry = fused.setdefault(doc.page_content, [doc, 0.0])
+                entry[1] += weight / (self.rrf_k + rank)
+
+        if not fused:
+            return []
+
+        ranked = [doc for doc, _ in sorted(fused.values(), key=lambda entry: entry[1], reverse=True)]
+
+        if self.reranker is not None and len(ranked) > 1:
+            candidates = ranked[:self.rerank_candidates]
+            with time_stage('rerank'):
+                scores = run_blocking(self.reranker.predict, [(query, doc.page_content) for doc in candidates])
+            ranked = [doc for _, doc in sorted(zip(scores, candidates), key=lambda pair: pair[0], reverse=True)]
+        ranked = ranked[:self.k]
+
+        # Fused and reranked scores only order one query's candidates; cosine similarity is on the
+        # same scale for every query, so a fixed floor can drop weak chunks. Chunk vectors are
+        # embedding cache hits from ingestion.
+        vectors = embeddings.embed_documents([doc.page_content for doc in ranked])
+        return [
+            Document(page_content=doc.page_content,
+                     metadata={**doc.metadata, 'relevance': round(cosine_similarity(query_vector, vector), 4)})
+            for doc, vector in zip(ranked, vectors)
+        ]
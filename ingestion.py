@@ -0,0 +1,153 @@
+"""
+Background document ingestion.
+
+Uploads are turned into jobs that run on a small, bounded worker pool so
+extraction and embedding never hold a request open and cannot starve chat
+traffic of CPU.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised when too many ingestion jobs are already waiting"""
+
+
+class IngestionJob:
+    """Status and per-stage progress of one document ingestion"""
+
+    def __init__(self, filename, original_name):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.original_name = original_name
+        self.status = 'queued'
+        self.progress = {
+            'pages_extracted': 0,
+            'chunks': 0,
+            'chunks_embedded': 0,
+            'chunks_reused': 0
+        }
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed')
+
+    def update(self, status=None, **progress):
+        """Move to a new stage and/or record progress counters"""
+        with self._lock:
+            if status:
+                self.status = status
+            self.progress.update(progress)
+            self.updated_at = time.time()
+
+    def complete(self, result):
+        with self._lock:
+            self.status = 'completed'
+            self.result = result
+            self.updated_at = time.time()
+
+    def fail(self, error):
+        with self._lock:
+            self.status = 'failed'
+            self.error = error
+            self.updated_at = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'filename': self.filename,
+                'original_name': self.original_name,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'updated_at': self.updated_at,
+                'elapsed': round(self.updated_at - self.created_at, 3)
+            }
+
+
+class IngestionQueue:
+    """Runs ingestion tasks on a bounded worker pool and keeps their status"""
+
+    def __init__(self, max_workers=1, max_pending=20, retention=3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename, original_name, task):
+        """Queue task(job) and return the job; raises QueueFull when saturated"""
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} ingestion jobs are already pending")
+
+            job = IngestionJob(filename, original_name)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def record(self, filename, original_name, result):
+        """Register a job that finished without queueing, e.g. a duplicate upload"""
+        job = IngestionJob(filename, original_name)
+        job.complete(result)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def in_progress(self, filename, exclude=None):
+        """Whether a job other than exclude is still working on filename"""
+        with self._lock:
+            return any(job.filename == filename and not job.finished and job is not exclude
+                       for job in self._jobs.values())
+
+    def jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'jobs': counts
+            }
+
+    def _run(self, job, task):
+        try:
+            task(job)
+        except Exception as e:
+            print(f"Ingestion job {job.id} error: {e}")
+            job.fail(str(e))
+        else:
+            if not job.finished:
+                job.fail('Ingestion task ended without a result')
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.updated_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,192 @@
+"""
+Pre-generated quiz question bank.
+
+Validated questions from past generations are stored per normalized topic,
+so quizzes on popular topics are sampled from SQLite in milliseconds and a
+background worker tops the stock back up before it runs out. Only topics
+requested repeatedly are refilled, and the refill backlog is bounded, so
+one-off topics cost a single generation.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from quiz_parser import normalize_question
+
+
+def normalize_topic(topic):
+    """Bank key for a topic: "  Photosynthesis!" and "photosynthesis" share one"""
+    text = unicodedata.normalize('NFKC', topic).casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def question_id(topic_key, question):
+    """Content hash so the same question is only banked once per topic"""
+    text = ' '.join(question['question'].casefold().split())
+    return hashlib.sha256(f"{topic_key}\n{text}".encode('utf-8')).hexdigest()
+
+
+class QuestionBank:
+    """Serves quizzes from stored questions and refills topics in the background"""
+
+    def __init__(self, database, generate, min_stock=20, refill_batch=10,
+                 max_per_topic=200, min_demand=3, max_pending_refills=8, workers=1):
+        self.database = database
+        self.generate = generate
+        self.min_stock = min_stock
+        self.refill_batch = refill_batch
+        self.max_per_topic = max_per_topic
+        self.min_demand = min_demand
+        self.max_pending_refills = max_pending_refills
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='question-bank')
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self.refills = 0
+        self.refill_failures = 0
+        self.refills_skipped = 0
+
+    def take(self, topic, count):
+        """Sample count questions for topic, or None if the bank holds too few"""
+        topic_key = normalize_topic(topic)
+        with self.database.connect() as conn:
+            rows = conn.execute(
+                """SELECT id, question FROM quiz_questions WHERE topic_key = ?
+                   ORDER BY served, RANDOM() LIMIT ?""",
+                (topic_key, count)
+            ).fetchall()
+
+            hit = len(rows) == count
+            if hit:
+                # Least-served first, so repeat quizzes rotate through the stock
+                conn.executemany("UPDATE quiz_questions SET served = served + 1 WHERE id = ?",
+                                 [(row[0],) for row in rows])
+            self._record_request(conn, topic_key, topic, hit)
+
+        if not hit:
+            return None
+
+        self.ensure_stock(topic)
+        return [json.loads(row[1]) for row in rows]
+
+    def add(self, topic, questions):
+        """Bank valid questions for topic; returns how many were new"""
+        topic_key = normalize_topic(topic)
+        rows = []
+        for question in questions or []:
+            question = normalize_question(question)
+            if question:
+                rows.append((question_id(topic_key, question), topic_key, json.dumps(question)))
+
+        if not rows:
+            return 0
+
+        with self.database.connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO quiz_questions (id, topic_key, question) VALUES (?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def stock(self, topic):
+        with self.database.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM quiz_questions WHERE topic_key = ?",
+                                (normalize_topic(topic),)).fetchone()[0]
+
+    def ensure_stock(self, topic):
+        """Schedule a background refill if a topic with real demand is below min_stock"""
+        topic_key = normalize_topic(topic)
+        with self.database.connect() as conn:
+            stock, demand = conn.execute(
+                """SELECT (SELECT COUNT(*) FROM quiz_questions WHERE topic_key = ?),
+                          (SELECT hits + misses FROM quiz_bank_topics WHERE topic_key = ?)""",
+                (topic_key, topic_key)
+            ).fetchone()
+        if stock >= self.min_stock or (demand or 0) < self.min_demand:
+            return False
+        with self._lock:
+            if topic_key in self._refilling:
+                return False
+            if len(self._refilling) >= self.max_pending_refills:
+                # Foreground quizzes still bank their questions; this topic is retried on its next request
+                self.refills_skipped += 1
+                return False
+            self._refilling.add(topic_key)
+        self._executor.submit(self._refill, topic, topic_key)
+        return True
+
+    def topic_stats(self, limit=50):
+        """Stock and hit rate of the most requested topics"""
+        with self.database.connect() as conn:
+            rows = conn.execute(
+                """SELECT t.topic_key, t.topic, t.hits, t.misses,
+                          (SELECT COUNT(*) FROM quiz_questions q WHERE q.topic_key = t.topic_key)
+                   FROM quiz_bank_topics t
+                   ORDER BY t.hits + t.misses DESC LIMIT ?""",
+                (limit,)
+            ).fetchall()
+
+        with self._lock:
+            refilling = set(self._refilling)
+
+        return [{
+            'topic_key': topic_key,
+            'topic': topic,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'stock': stock,
+            'refilling': topic_key in refilling
+        } for topic_key, topic, hits, misses, stock in rows]
+
+    def stats(self):
+        with self.database.connect() as conn:
+            topics, hits, misses = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(misses), 0) FROM quiz_bank_topics"
+            ).fetchone()
+            questions = conn.execute("SELECT COUNT(*) FROM quiz_questions").fetchone()[0]
+
+        with self._lock:
+            return {
+                'topics': topics,
+                'questions': questions,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+                'refilling': len(self._refilling),
+                'refills': self.refills,
+                'refill_failures': self.refill_failures,
+                'refills_skipped': self.refills_skipped
+            }
+
+    def _record_request(self, conn, topic_key, topic, hit):
+        conn.execute(
+            """INSERT INTO quiz_bank_topics (topic_key, topic, hits, misses, last_requested)
+               VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT (topic_key) DO UPDATE SET
+                   hits = hits + excluded.hits,
+                   misses = misses + excluded.misses,
+                   last_requested = excluded.last_requested""",
+            (topic_key, topic, int(hit), int(not hit))
+        )
+
+    def _refill(self, topic, topic_key):
+        try:
+            if self.stock(topic) >= self.max_per_topic:
+                return
+            added = self.add(topic, self.generate(topic, self.refill_batch))
+            with self._lock:
+                self.refills += 1
+            print(f"🧠 Question bank: +{added} questions for '{topic_key}'")
+        except Exception as e:
+            print(f"Question bank refill error for '{topic_key}': {e}")
+            with self._lock:
+                self.refill_failures += 1
+        finally:
+            with self._lock:
+                self._refilling.discard(topic_key)
@@ -0,0 +1,117 @@
+"""
+Incremental, validating parser for LLM quiz output.
+
+Question objects are pulled out of the response as soon as their closing
+brace arrives, whatever surrounds them (code fences, prose, a truncated
+array), and each one is validated on its own. A malformed or cut-off
+question is dropped instead of failing the whole quiz, so only the missing
+questions need to be requested again.
+"""
+
+import json
+import re
+
+
+def normalize_question(question):
+    """Return a clean copy of a generated question, or None if it is malformed"""
+    if not isinstance(question, dict):
+        return None
+
+    text = question.get('question')
+    options = question.get('options')
+    correct = question.get('correct')
+    explanation = question.get('explanation')
+
+    if not isinstance(text, str) or not text.strip():
+        return None
+    if not isinstance(options, list) or len(options) != 4:
+        return None
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return None
+    options = [option.strip() for option in options]
+    if len(set(options)) != 4:
+        return None
+    if not isinstance(correct, str):
+        return None
+    correct = _match_option(correct.strip(), options)
+    if correct is None:
+        return None
+    if not isinstance(explanation, str):
+        return None
+
+    return {
+        'question': text.strip(),
+        'options': options,
+        'correct': correct,
+        'explanation': explanation.strip()
+    }
+
+
+def _match_option(correct, options):
+    """Repair answers given as a bare letter ("B") or as the option text without its label"""
+    if correct in options:
+        return correct
+    label = re.match(r'^\(?([A-Da-d])\)?[.)]?$', correct)
+    if label:
+        return options['abcd'.index(label.group(1).lower())]
+    for option in options:
+        if re.sub(r'^[A-Da-d][.)]\s*', '', option).casefold() == correct.casefold():
+            return option
+    return None
+
+
+class QuizStreamParser:
+    """Feed response text as it streams in; complete, valid questions come out"""
+
+    def __init__(self):
+        self.parsed = 0
+        self.invalid = 0
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text):
+        """Consume a chunk of text and return the questions it completed"""
+        questions = []
+        for char in text:
+            if self._depth == 0:
+                # Anything between objects (brackets, commas, fences, prose) is skipped
+                if char == '{':
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    question = self._finish()
+                    if question:
+                        questions.append(question)
+        return questions
+
+    def _finish(self):
+        raw = ''.join(self._buffer)
+        self._buffer = []
+        try:
+            question = normalize_question(json.loads(raw))
+        except ValueError:
+            question = None
+
+        if question:
+            self.parsed += 1
+        else:
+            self.invalid += 1
+        return question
@@ -0,0 +1,118 @@
+"""
+Semantic response cache for the RAG chat chain.
+
+Answers are keyed on the query embedding, so paraphrases of a popular
+question ("what is photosynthesis" / "what's photosynthesis?") share one
+Gemini round-trip. Follow-up questions are cached under a scope, a digest
+of the conversation history they were answered with, and only match
+questions asked after that same history.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticResponseCache:
+    """LRU cache of chat responses matched by cosine similarity of queries"""
+
+    def __init__(self, embeddings, threshold=0.95, ttl=3600, max_entries=1000):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def embed(self, query):
+        """Embed a query and normalize it so a dot product is the cosine"""
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, query_vector, scope=''):
+        """Return the cached entry in scope closest to the query, or None on a miss"""
+        with self._lock:
+            self._expire()
+            keys = [key for key in self._entries if key[0] == scope]
+            if not keys:
+                self.misses += 1
+                return None
+
+            matrix = np.stack([self._entries[key]['vector'] for key in keys])
+            scores = matrix @ query_vector
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            key = keys[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            entry = self._entries[key]
+            return {
+                'query': key[1],
+                'response': entry['response'],
+                'sources': list(entry['sources']),
+                'similarity': float(scores[best])
+            }
+
+    def store(self, query, query_vector, response, sources, scope=''):
+        """Cache a response together with the sources that produced it"""
+        key = (scope, query)
+        with self._lock:
+            self._entries[key] = {
+                'vector': query_vector,
+                'response': response,
+                'sources': list(sources),
+                'created': time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_sources(self, sources):
+        """Drop every cached answer that was built from any of the given sources"""
+        sources = set(sources)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if sources.intersection(entry['sources'])]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'threshold': self.threshold,
+                'ttl': self.ttl
+            }
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        stale = [key for key, entry in self._entries.items() if entry['created'] < cutoff]
+        for key in stale:
+            del self._entries[key]
+        self.evictions += len(stale)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the AI Tutor.
+
+Serves the Flask app on gevent's WSGI server. The standard library is
+monkey-patched before anything else is imported, so Gemini, speech and
+retrieval I/O yield instead of holding a worker and one process can keep
+hundreds of LLM calls in flight. CPU-bound work is moved onto native
+threads by concurrency.run_blocking.
+
+    python serve.py --host 0.0.0.0 --port 5000
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+
+from gevent.pool import Pool  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--max-connections', type=int, default=int(os.environ.get('MAX_CONNECTIONS', 1000)),
+                        help='concurrent connections served before new ones wait')
+    parser.add_argument('--certfile', default=os.environ.get('SSL_CERTFILE'))
+    parser.add_argument('--keyfile', default=os.environ.get('SSL_KEYFILE'))
+    args = parser.parse_args()
+
+    from app import app
+
+    ssl_args = {}
+    if args.certfile and args.keyfile:
+        ssl_args = {'certfile': args.certfile, 'keyfile': args.keyfile}
+
+    server = WSGIServer((args.host, args.port), app, spawn=Pool(args.max_connections), **ssl_args)
+    scheme = 'https' if ssl_args else 'http'
+    print(f"🚀 AI Tutor serving on {scheme}://{args.host}:{args.port} (gevent, up to {args.max_connections} connections)")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Request coalescing ("single-flight").
+
+Identical requests that arrive while one is already in flight wait for
+that call instead of starting their own, so a classroom asking the same
+question at once costs one retrieval and one Gemini call. Streams are
+produced once on a background thread and replayed to every subscriber.
+"""
+
+import threading
+import unicodedata
+
+
+def normalize_key(text):
+    """Coalescing key for free text: case, width and spacing don't matter"""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+class _Flight:
+    """One in-flight call and everything it has produced so far"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.items = []
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), sharing the result with concurrent callers of key"""
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                flight.result = func(*args, **kwargs)
+            except Exception as e:
+                flight.error = e
+            finally:
+                self._land(key, flight)
+        else:
+            with flight.cond:
+                flight.cond.wait_for(lambda: flight.done)
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key, func, *args, **kwargs):
+        """Iterate func(*args, **kwargs), replaying one shared run to concurrent callers of key"""
+        flight, leader = self._join(key)
+        if leader:
+            # Produced off the request so a disconnecting client can't cut the others short
+            threading.Thread(
+                target=self._produce,
+                args=(key, flight, func, args, kwargs),
+                name=f'{self.name}-single-flight',
+                daemon=True
+            ).start()
+        return self._subscribe(flight)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights),
+                'coalesced_ratio': round(self.coalesced / (self.calls + self.coalesced), 4)
+                if self.calls + self.coalesced else None
+            }
+
+    def _join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self.calls += 1
+            return flight, True
+
+    def _land(self, key, flight):
+        # Forget the key first: requests arriving from now on start a fresh call
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.cond:
+            flight.done = True
+            flight.cond.notify_all()
+
+    def _produce(self, key, flight, func, args, kwargs):
+        try:
+            for item in func(*args, **kwargs):
+                with flight.cond:
+                    flight.items.append(item)
+                    flight.cond.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            self._land(key, flight)
+
+    def _subscribe(self, flight):
+        index = 0
+        while True:
+            with flight.cond:
+                flight.cond.wait_for(lambda: index < len(flight.items) or flight.done)
+                items = flight.items[index:]
+                index += len(items)
+                finished = flight.done
+            yield from items
+            if finished:
+                break
+
+        if flight.error is not None:
+            raise flight.error
@@ -0,0 +1,176 @@
+"""
+In-memory speech recognition for uploaded audio.
+
+Audio is decoded in memory, without temp files and without a local
+microphone. WAV is decoded straight from the request stream and read in
+fixed windows, each transcribed as soon as it arrives, so a chunked
+upload yields partial transcripts before the upload has finished. AIFF
+and FLAC are buffered first, since telling them apart takes rewinds. The
+recognizer engine is pluggable: Google's web API by default, or an
+offline CPU engine (PocketSphinx or Whisper) chosen by name.
+"""
+
+import io
+import threading
+import time
+
+import speech_recognition as sr
+
+from concurrency import run_blocking
+
+
+def _recognize_google(recognizer, audio, language):
+    return recognizer.recognize_google(audio, language=language)
+
+
+def _recognize_sphinx(recognizer, audio, language):
+    # Offline decoding is CPU-bound, so it leaves the event loop
+    return run_blocking(recognizer.recognize_sphinx, audio, language=language)
+
+
+def _recognize_whisper(recognizer, audio, language, model='base'):
+    return run_blocking(recognizer.recognize_whisper, audio, model=model)
+
+
+ENGINES = {
+    'google': _recognize_google,
+    'sphinx': _recognize_sphinx,
+    'whisper': _recognize_whisper,
+}
+
+
+class _PrefixedStream:
+    """A read-only stream with the already-read header put back in front"""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        if not self.prefix:
+            return self.stream.read(size)
+        if size is None or size < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b''
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data))
+        return data
+
+
+class _BufferedAudioFile(sr.AudioFile):
+    """An in-memory audio payload; sr.AudioFile probes WAV, AIFF then FLAC and each probe starts from byte 0"""
+
+    def __init__(self, data):
+        self.data = data
+        super().__init__(io.BytesIO(data))
+
+    @property
+    def filename_or_fileobject(self):
+        return io.BytesIO(self.data)
+
+    @filename_or_fileobject.setter
+    def filename_or_fileobject(self, value):
+        pass
+
+
+def open_audio(stream):
+    """An sr.AudioFile for an upload stream: WAV stays streamed, other containers are buffered"""
+    header = stream.read(4)
+    if header == b'RIFF':
+        # sr.AudioFile reads WAV sequentially, so a non-seekable request stream works
+        return sr.AudioFile(_PrefixedStream(header, stream))
+    return _BufferedAudioFile(header + stream.read())
+
+
+class SpeechService:
+    """Transcribes audio streams window by window with a configurable engine"""
+
+    def __init__(self, engine='google', language='en-US', chunk_seconds=10):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown speech engine '{engine}', expected one of {', '.join(ENGINES)}")
+        self.engine = engine
+        self.language = language
+        self.chunk_seconds = chunk_seconds
+        self.recognizer = sr.Recognizer()
+        self._recognize = ENGINES[engine]
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.audio_seconds = 0.0
+        self.seconds = 0.0
+
+    def transcribe(self, stream):
+        """Transcribe a whole stream; returns {'text', 'audio_seconds', 'latency'}"""
+        result = None
+        for result in self.transcribe_stream(stream):
+            pass
+        return result
+
+    def transcribe_stream(self, stream):
+        """Yield a cumulative result after each window; raises sr.UnknownValueError if nothing was heard"""
+        started = time.perf_counter()
+        texts = []
+        audio_seconds = 0.0
+        try:
+            with open_audio(stream) as source:
+                while True:
+                    audio = self._read_window(source)
+                    if not audio.frame_data:
+                        break
+                    audio_seconds += len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+                    try:
+                        texts.append(self._recognize(self.recognizer, audio, self.language))
+                    except sr.UnknownValueError:
+                        # Silence or noise in this window; later windows may still have speech
+                        pass
+                    yield self._result(texts, audio_seconds, started, final=False)
+
+            if not texts:
+                raise sr.UnknownValueError()
+        except Exception:
+            self._record(audio_seconds, started, failed=True)
+            raise
+
+        result = self._result(texts, audio_seconds, started, final=True)
+        self._record(audio_seconds, started)
+        yield result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'engine': self.engine,
+                'requests': self.requests,
+                'failures': self.failures,
+                'audio_seconds': round(self.audio_seconds, 2),
+                'avg_latency': round(self.seconds / self.requests, 3) if self.requests else None,
+                # Processing time per second of audio; below 1.0 is faster than real time
+                'real_time_factor': round(self.seconds / self.audio_seconds, 3) if self.audio_seconds else None
+            }
+
+    def _read_window(self, source):
+        """Up to chunk_seconds of audio; Recognizer.record(duration=...) drops a buffer at every window edge"""
+        frames_left = int(self.chunk_seconds * source.SAMPLE_RATE)
+        data = bytearray()
+        while frames_left > 0:
+            buffer = source.stream.read(min(source.CHUNK, frames_left))
+            if not buffer:
+                break
+            data += buffer
+            frames_left -= len(buffer) // source.SAMPLE_WIDTH
+        return sr.AudioData(bytes(data), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def _result(self, texts, audio_seconds, started, final):
+        return {
+            'text': ' '.join(texts),
+            'audio_seconds': round(audio_seconds, 2),
+            'latency': round(time.perf_counter() - started, 3),
+            'final': final
+        }
+
+    def _record(self, audio_seconds, started, failed=False):
+        with self._lock:
+            self.requests += 1
+            self.failures += failed
+            self.audio_seconds += audio_seconds
+            self.seconds += time.perf_counter() - started
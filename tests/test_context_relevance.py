@@ -0,0 +1,52 @@
+import re
+import uuid
+
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+from context_builder import ContextBuilder
+from hybrid_retriever import HybridRetriever
+
+VOCABULARY = ['plants', 'photosynthesis', 'light', 'energy', 'chlorophyll', 'sugar',
+              'french', 'revolution', 'king', 'paris', 'how', 'do', 'the', 'in']
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        words = re.findall(r'\w+', text.lower())
+        return [float(words.count(term)) for term in VOCABULARY]
+
+
+def retriever():
+    vectorstore = Chroma.from_texts(
+        [
+            "Photosynthesis lets plants turn light energy into sugar.",
+            "Chlorophyll in plants absorbs the light used for photosynthesis.",
+            "The French Revolution began in Paris and ended the rule of the king.",
+        ],
+        BagOfWordsEmbeddings(),
+        collection_name=f"test-{uuid.uuid4().hex}"
+    )
+    return HybridRetriever.from_vectorstore(vectorstore, k=3, dense_k=3, sparse_k=3)
+
+
+def test_relevance_is_similarity_to_the_question():
+    docs = retriever().invoke("How do plants use light for photosynthesis?")
+    relevance = {doc.page_content.split()[0]: doc.metadata['relevance'] for doc in docs}
+    assert relevance['Photosynthesis'] > 0.5
+    assert relevance['Chlorophyll'] > 0.5
+    # Shares no words with the question, though BM25 and vector search still return it
+    assert relevance['The'] < 0.25
+
+
+def test_irrelevant_chunk_is_excluded_from_the_context():
+    docs = retriever().invoke("How do plants use light for photosynthesis?")
+    assert len(docs) == 3
+
+    selected, report = ContextBuilder(token_budget=500, min_relevance=0.25).select(docs)
+    assert report['dropped_low_score'] == 1
+    assert all('Revolution' not in doc.page_content for doc in selected)
+    assert len(selected) == 2
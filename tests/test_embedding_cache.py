@@ -0,0 +1,48 @@
+import sqlite3
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+def vectors(count):
+    return [np.full(4, index, dtype=np.float32) for index in range(count)]
+
+
+def test_prunes_least_recently_used_rows_past_the_cap(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.db'), 'model', memory_entries=1, max_entries=10)
+    texts = [f'text {index}' for index in range(10)]
+    cache.put_many(texts, vectors(10))
+    with cache.database.connect() as conn:
+        conn.execute("UPDATE embeddings SET last_used = 0")
+        conn.execute("UPDATE embeddings SET last_used = 1 WHERE key = ?", (cache.key('text 0'),))
+
+    cache.put_many(['text 10'], vectors(1))
+
+    stats = cache.stats()
+    assert stats['entries'] == 9
+    assert stats['pruned'] == 2
+    assert cache.get_many(['text 0'])[0] is not None
+    with sqlite3.connect(cache.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 9
+
+
+def test_running_count_ignores_rows_already_cached(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = EmbeddingCache(path, 'model')
+    cache.put_many(['a', 'b'], vectors(2))
+    cache.put_many(['b', 'c'], vectors(2))
+    assert cache.stats()['entries'] == 3
+
+    assert EmbeddingCache(path, 'model').stats()['entries'] == 3
+
+
+def test_adds_last_used_to_an_existing_table(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID")
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)", (b'old', np.zeros(4, dtype=np.float32).tobytes()))
+
+    cache = EmbeddingCache(path, 'model', max_entries=10)
+    cache.put_many(['new'], vectors(1))
+    assert cache.stats()['entries'] == 2
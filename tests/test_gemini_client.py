@@ -0,0 +1,66 @@
+import pytest
+import requests
+
+from gemini_client import CircuitBreaker, CircuitOpenError, GeminiClient, GeminiError
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'candidates': []}
+
+    def close(self):
+        pass
+
+
+def half_open_client(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == 'half_open'
+    client = GeminiClient('key', 'http://gemini.test/model', max_retries=0, breaker=breaker)
+    monkeypatch.setattr(client, '_backoff', lambda *args: 0)
+    return client
+
+
+def test_non_http_error_during_half_open_trial_releases_the_trial(monkeypatch):
+    client = half_open_client(monkeypatch)
+
+    def truncated(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+
+    monkeypatch.setattr(client.session, 'post', truncated)
+    with pytest.raises(GeminiError):
+        client.generate_content({})
+    assert not client.breaker._trial_in_flight
+
+    # Once the upstream recovers, the next trial goes through and closes the breaker
+    client.breaker.opened_at = 0
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: FakeResponse())
+    assert client.generate_content({}) == {'candidates': []}
+    assert client.breaker.state == 'closed'
+
+
+def test_interrupted_half_open_trial_is_released(monkeypatch):
+    client = half_open_client(monkeypatch)
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(client.session, 'post', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        client.generate_content({})
+    assert not client.breaker._trial_in_flight
+
+
+def test_open_breaker_rejects_without_calling_upstream(monkeypatch):
+    client = half_open_client(monkeypatch)
+    client.breaker.reset_timeout = 60
+    client.breaker.opened_at = float('inf')
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: pytest.fail("upstream called"))
+    with pytest.raises(CircuitOpenError):
+        client.generate_content({})
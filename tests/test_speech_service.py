@@ -0,0 +1,57 @@
+import io
+import math
+import struct
+
+import pytest
+import speech_recognition as sr
+
+from speech_service import SpeechService
+
+SAMPLE_RATE = 16000
+
+
+class UploadStream:
+    """A request body: read() only, no seek or tell"""
+
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buffer.read(size)
+
+
+def tone(seconds):
+    frames = b''.join(struct.pack('<h', int(8000 * math.sin(2 * math.pi * 440 * n / SAMPLE_RATE)))
+                      for n in range(int(seconds * SAMPLE_RATE)))
+    return sr.AudioData(frames, SAMPLE_RATE, 2)
+
+
+def service(chunk_seconds=1):
+    speech = SpeechService(chunk_seconds=chunk_seconds)
+    # Stand-in engine: one word per window, named by its length
+    speech._recognize = lambda recognizer, audio, language: f"{len(audio.frame_data) // 2}"
+    return speech
+
+
+@pytest.mark.parametrize('encode', [
+    sr.AudioData.get_wav_data,
+    sr.AudioData.get_aiff_data,
+    sr.AudioData.get_flac_data,
+], ids=['wav', 'aiff', 'flac'])
+def test_transcribes_each_supported_container(encode):
+    payload = encode(tone(2.5))
+    result = service().transcribe(UploadStream(payload))
+    assert result['text'] == '16000 16000 8000'
+    assert result['audio_seconds'] == 2.5
+    assert result['final']
+
+
+def test_wav_upload_yields_partial_transcripts():
+    results = list(service().transcribe_stream(UploadStream(tone(2).get_wav_data())))
+    assert [result['text'] for result in results] == ['16000', '16000 16000', '16000 16000']
+    assert [result['final'] for result in results] == [False, False, True]
+
+
+def test_unknown_container_is_rejected():
+    with pytest.raises(ValueError):
+        service().transcribe(UploadStream(b'OggS' + b'\0' * 64))
@@ -0,0 +1,214 @@
+"""
+Server-side speech rendering to cached audio files.
+
+Text is split at sentence boundaries and each segment is rendered with
+pyttsx3's save_to_file in a pool of worker processes (one engine each),
+so users don't queue behind each other and the first segment is ready
+long before the last. Rendered audio is stored under a hash of the voice
+settings and text, with least-recently-used eviction past a size limit,
+so repeated tutor phrases are served straight from disk.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pyttsx3
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;:])\s+|\n+')
+
+# One engine per worker process, created on its first render
+_engine = None
+
+
+def split_sentences(text, max_chars=250):
+    """Split text into speakable segments of whole sentences, each at most max_chars"""
+    segments = []
+    current = ''
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        # Overlong sentences are cut at the last space that fits
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces = sentence[:cut].strip(), sentence[cut:].strip()
+            if current:
+                segments.append(current)
+                current = ''
+            segments.append(pieces[0])
+            sentence = pieces[1]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _render(text, path, rate, volume, voice_hint):
+    """Process pool task: render text to an audio file at path"""
+    global _engine
+    if _engine is None:
+        _engine = pyttsx3.init()
+        for voice in _engine.getProperty('voices') or []:
+            if voice_hint and any(hint in voice.name.lower() for hint in voice_hint):
+                _engine.setProperty('voice', voice.id)
+                break
+        _engine.setProperty('rate', rate)
+        _engine.setProperty('volume', volume)
+
+    # Render beside the final name and swap in, so readers never see a partial file
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    try:
+        _engine.save_to_file(text, partial)
+        _engine.runAndWait()
+        if not os.path.exists(partial) or not os.path.getsize(partial):
+            raise RuntimeError("TTS engine produced no audio")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return os.path.getsize(path)
+
+
+class TTSRenderer:
+    """Renders text to sentence-sized audio segments through a content-hash cache"""
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, processes=2, segment_chars=250,
+                 rate=150, volume=0.8, voice_hint=('female', 'zira')):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.segment_chars = segment_chars
+        self.settings = (rate, volume, tuple(voice_hint))
+        self._executor = ProcessPoolExecutor(max_workers=processes)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._files = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self.hits = 0
+        self.renders = 0
+        self.failures = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Rebuild the index from disk, oldest access first
+        entries = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith('.partial'):
+                os.remove(path)
+            elif name.endswith('.wav'):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-len('.wav')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._bytes += size
+
+    def key(self, text):
+        rate, volume, voice_hint = self.settings
+        return hashlib.sha256(f"{rate}|{volume}|{','.join(voice_hint)}|{text}".encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def synthesize(self, text, first_timeout=30):
+        """Queue every segment of text; returns [(key, segment, cached)] once the first is ready"""
+        segments = []
+        for segment in split_sentences(text, self.segment_chars):
+            key = self.key(segment)
+            cached = self._touch(key)
+            if cached:
+                with self._lock:
+                    self.hits += 1
+            else:
+                self._submit(key, segment)
+            segments.append((key, segment, cached))
+
+        if segments and not segments[0][2]:
+            self.wait(segments[0][0], first_timeout)
+        return segments
+
+    def wait(self, key, timeout=30):
+        """Path of the rendered audio for key, waiting for a pending render; None if unknown or failed"""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                return None
+            # Waiters can wake before the done callback has indexed the file
+            self._rendered(key, future)
+        return self.path(key) if self._touch(key) else None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.renders
+            return {
+                'entries': len(self._files),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'pending': len(self._pending),
+                'hits': self.hits,
+                'renders': self.renders,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'failures': self.failures,
+                'evictions': self.evictions
+            }
+
+    def _touch(self, key):
+        with self._lock:
+            if key not in self._files:
+                return False
+            self._files.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes -= self._files.pop(key, 0)
+            return False
+        return True
+
+    def _submit(self, key, text):
+        with self._lock:
+            if key in self._pending:
+                return
+            future = self._executor.submit(_render, text, self.path(key), *self.settings)
+            self._pending[key] = future
+            self.renders += 1
+        future.add_done_callback(lambda done: self._rendered(key, done))
+
+    def _rendered(self, key, future):
+        """Index a finished render and evict past max_bytes; safe to call twice"""
+        evicted = []
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            elif key in self._files:
+                return
+            if future.exception() is not None:
+                self.failures += 1
+                print(f"TTS render error: {future.exception()}")
+                return
+            size = future.result()
+            self._bytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            while self._bytes > self.max_bytes and len(self._files) > 1:
+                old_key, old_size = self._files.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self.path(old_key))
+            except FileNotFoundError:
+                pass